@@ -6,8 +6,11 @@ the B-route meter using a DataUpdateCoordinator.
 Also provides a diagnostic sensor that shows device status and network information.
 """
 
-import dataclasses
+import bisect
 import logging
+from collections.abc import Callable
+from dataclasses import replace
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -23,9 +26,10 @@ from homeassistant.const import (
     UnitOfEnergy,
     UnitOfPower,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DEVICE_MANUFACTURER,
@@ -34,10 +38,114 @@ from .const import (
     DEVICE_UNIQUE_ID,
     DOMAIN,
 )
+from .coordinator import BRouteDataCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-SENSOR_TYPES: list[SensorEntityDescription] = [
+# Output precision for numeric meter readings, keyed by sensor key
+_NUMERIC_FORMATTERS: dict[str, Callable[[float], float | int]] = {
+    "e7_power": int,  # Power, integer
+    "e8_current": lambda value: round(value, 1),  # Current, 1 decimal place
+    "e9_voltage": lambda value: round(value, 1),  # Voltage, 1 decimal place
+    "ea_forward": lambda value: round(value, 2),  # Energy, 2 decimal places
+    "eb_reverse": lambda value: round(value, 2),  # Energy, 2 decimal places
+}
+
+# Coordinator data key holding the measurement timestamp for a sensor
+_TIMESTAMP_KEYS: dict[str, str] = {
+    "e7_power": "power_timestamp",
+    "ea_forward": "forward_timestamp",
+    "eb_reverse": "reverse_timestamp",
+}
+
+# Device information shared by every sensor of the meter
+_DEVICE_INFO = DeviceInfo(
+    identifiers={(DOMAIN, DEVICE_UNIQUE_ID)},
+    name=DEVICE_NAME,
+    manufacturer=DEVICE_MANUFACTURER,
+    model=DEVICE_MODEL,
+    sw_version="1.0.0",
+)
+
+# RSSI thresholds (dBm) and the signal quality label for each bucket
+_RSSI_BUCKETS = (-80, -70)
+_RSSI_LABELS = ("POOR", "FAIR", "GOOD")
+
+# Diagnostic info fields exposed as attributes when set:
+# (DiagnosticInfo field, attribute key, optional formatter)
+_DIAGNOSTIC_ATTRIBUTES: tuple[tuple[str, str, Callable[[Any], Any] | None], ...] = (
+    # Device information
+    ("mac_address", "mac_address", None),
+    ("ipv6_address", "ipv6_address", None),
+    ("stack_version", "stack_version", None),
+    ("app_version", "app_version", None),
+    # Network configuration
+    ("channel", "channel", None),
+    ("pan_id", "pan_id", None),
+    # Network status
+    ("udp_ports", "udp_ports", lambda ports: ", ".join(map(str, ports))),
+    ("tcp_ports", "tcp_ports", lambda ports: ", ".join(map(str, ports))),
+)
+
+# Diagnostic info list fields: (DiagnosticInfo field, count key, item key prefix)
+_DIAGNOSTIC_LISTS: tuple[tuple[str, str, str], ...] = (
+    ("active_tcp_connections", "tcp_connections_count", "tcp_connection"),
+    ("neighbor_devices", "neighbor_devices_count", "neighbor_device"),
+)
+
+
+def _diagnostic_status(
+    is_online: bool, rssi: int | None, tcp_count: int, neighbor_count: int
+) -> str:
+    """Return the diagnostic sensor state, e.g. "ONLINE (GOOD -65dBm) (1 CONN)"."""
+    connection_status = "ONLINE" if is_online else "OFFLINE"
+
+    # Add signal strength information (if available)
+    if rssi is not None:
+        signal_quality = _RSSI_LABELS[bisect.bisect_right(_RSSI_BUCKETS, rssi)]
+        connection_status = f"{connection_status} ({signal_quality} {rssi}dBm)"
+
+    # Add connection and neighbor count information
+    connection_info = []
+    if tcp_count:
+        connection_info.append(f"{tcp_count} CONN")
+    if neighbor_count:
+        connection_info.append(f"{neighbor_count} NEIGH")
+
+    # Combine status components
+    if connection_info:
+        return f"{connection_status} ({', '.join(connection_info)})"
+    return connection_status
+
+
+def _has_operational_info(data: dict) -> bool:
+    """Return True if the meter reports any operation status attribute."""
+    return (
+        data.get("operation_status") is not None
+        or data.get("error_status") is not None
+        or data.get("meter_type") is not None
+    )
+
+
+def _has_value(key: str) -> Callable[[dict], bool]:
+    """Return a predicate checking that the meter reports a value for key."""
+    return lambda data: data.get(key) is not None
+
+
+# Support checks for sensors that are disabled by default, keyed by sensor key
+_ENABLE_PREDICATES: dict[str, Callable[[dict], bool]] = {
+    # Diagnostic sensor is enabled as soon as the meter returns any data
+    "diagnostic_info": lambda data: True,
+    "operation_status": _has_operational_info,
+    "error_status": _has_operational_info,
+    "meter_type": _has_operational_info,
+    "current_limit": _has_value("current_limit"),
+    "detected_abnormality": _has_value("detected_abnormality"),
+    "power_unit": _has_value("power_unit"),
+    "rssi": _has_value("rssi"),
+}
+
+SENSOR_TYPES: tuple[SensorEntityDescription, ...] = (
     SensorEntityDescription(
         key="diagnostic_info",
         translation_key="diagnostic_info",
@@ -152,7 +260,7 @@ SENSOR_TYPES: list[SensorEntityDescription] = [
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,  # Disabled by default, but included in diagnostic info
     ),
-]
+)
 
 
 async def async_setup_entry(
@@ -180,70 +288,21 @@ async def async_setup_entry(
 
     # Create all sensor entities
     for description in SENSOR_TYPES:
-        # Check if sensor should be enabled
-        should_enable = True
-
-        # 如果是高级功能传感器，检查它们是否被支持
         key = description.key
 
-        # Sensors disabled by default need support check
-        if not description.entity_registry_enabled_default:
-            should_enable = False
-
-            # Check if this feature is supported
-            if data:
-                # Operation status related sensors
-                if key in ["operation_status", "error_status", "meter_type"]:
-                    if (
-                        data.get("operation_status") is not None
-                        or data.get("error_status") is not None
-                        or data.get("meter_type") is not None
-                    ):
-                        _LOGGER.info("Enabling operation status sensor: %s", key)
-                        should_enable = True
-
-                # Current limit sensor
-                elif key == "current_limit" and data.get("current_limit") is not None:
-                    _LOGGER.info("Enabling current limit sensor")
-                    should_enable = True
-
-                # Abnormality detection sensor
-                elif (
-                    key == "detected_abnormality"
-                    and data.get("detected_abnormality") is not None
-                ):
-                    _LOGGER.info("Enabling abnormality detection sensor")
-                    should_enable = True
-
-                # Power unit sensor
-                elif key == "power_unit" and data.get("power_unit") is not None:
-                    _LOGGER.info("Enabling power unit sensor")
-                    should_enable = True
-
-                # RSSI sensor
-                elif key == "rssi" and data.get("rssi") is not None:
-                    _LOGGER.info("Enabling RSSI sensor")
-                    should_enable = True
-
-                # Basic sensors and diagnostic sensors are always added
-                elif key in [
-                    "e7_power",
-                    "e8_current",
-                    "e9_voltage",
-                    "ea_forward",
-                    "eb_reverse",
-                    "diagnostic_info",
-                ]:
-                    should_enable = True
+        # Sensors disabled by default are only enabled if the meter supports them
+        should_enable = description.entity_registry_enabled_default
+        if not should_enable and data:
+            predicate = _ENABLE_PREDICATES.get(key)
+            if predicate is not None and predicate(data):
+                _LOGGER.info("Enabling supported sensor: %s", key)
+                should_enable = True
 
         # Create sensor and set entity_registry_enabled_default
         sensor = BRouteSensorEntity(entry, description)
         if should_enable != description.entity_registry_enabled_default:
-            sensor.entity_description = SensorEntityDescription(
-                **{
-                    **dataclasses.asdict(description),
-                    "entity_registry_enabled_default": should_enable,
-                }
+            sensor.entity_description = replace(
+                description, entity_registry_enabled_default=should_enable
             )
             _LOGGER.debug(
                 "Modified entity_registry_enabled_default for %s to %s",
@@ -257,15 +316,18 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class BRouteSensorEntity(SensorEntity):
+class BRouteSensorEntity(CoordinatorEntity[BRouteDataCoordinator], SensorEntity):
     """B-Route sensor entity referencing a SensorEntityDescription.
 
-    We store a reference to the DataUpdateCoordinator and a SensorEntityDescription,
-    and we get the current sensor value from coordinator.data.
+    CoordinatorEntity keeps the reference to the DataUpdateCoordinator and
+    handles listener registration; we get the current sensor value from
+    coordinator.data.
     """
 
     # According to HA latest specifications, new integrations must set has_entity_name to True
     _attr_has_entity_name = True
+    # All sensors belong to the same meter device
+    _attr_device_info = _DEVICE_INFO
 
     def __init__(
         self,
@@ -273,45 +335,44 @@ class BRouteSensorEntity(SensorEntity):
         description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-
-        self._coordinator = config_entry.runtime_data
+        super().__init__(config_entry.runtime_data)
         self.entity_description = description
         self._attr_unique_id = f"b_route_{description.key}"
         self._last_state = None
         self._last_timestamp = None
+        # Last (available, value, attributes) written to the state machine
+        self._last_written = None
+        # Value and attributes are recomputed only when the coordinator has new data
+        self._update_from_coordinator()
         _LOGGER.debug(
             "Setting up B-Route sensor entity for %s", self.entity_description.key
         )
 
-    @property
-    def should_poll(self) -> bool:
-        """Disable polling, because DataUpdateCoordinator handles updates."""
-        return False
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device information for this sensor."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, DEVICE_UNIQUE_ID)},
-            name=DEVICE_NAME,
-            manufacturer=DEVICE_MANUFACTURER,
-            model=DEVICE_MODEL,
-            sw_version="1.0.0",
+    async def async_added_to_hass(self) -> None:
+        """Refresh value and attributes with the data current when added to hass."""
+        await super().async_added_to_hass()
+        self._update_from_coordinator()
+
+    def _update_from_coordinator(self) -> None:
+        """Compute the sensor value and attributes from the coordinator data."""
+        self._attr_native_value = self._compute_native_value()
+        self._attr_extra_state_attributes = self._build_extra_state_attributes(
+            self.coordinator.data
         )
 
-    @property
-    def available(self) -> bool:
-        """Is sensor available."""
-        # Always available regardless of coordinator update status
-        # This allows sensors to show the last known value even when updates fail
-        return True
-
-    @property
-    def extra_state_attributes(self) -> dict[str, str]:
-        """Return entity specific state attributes."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state only if it differs from the last one written."""
+        self._update_from_coordinator()
+        new_state = (self.available, self.native_value, self.extra_state_attributes)
+        if new_state == self._last_written:
+            return
+        self._last_written = new_state
+        self.async_write_ha_state()
+
+    def _build_extra_state_attributes(self, data) -> dict[str, str]:
+        """Build the state attributes from the coordinator data."""
         attributes = {}
-        data = self._coordinator.data
-        timestamp_key = None
 
         if not data:
             return attributes
@@ -320,51 +381,24 @@ class BRouteSensorEntity(SensorEntity):
         if self.entity_description.key == "diagnostic_info":
             diagnostic_data = data.get("diagnostic_info")
             if diagnostic_data:
-                # Device information
-                if diagnostic_data.mac_address:
-                    attributes["mac_address"] = diagnostic_data.mac_address
-                if diagnostic_data.ipv6_address:
-                    attributes["ipv6_address"] = diagnostic_data.ipv6_address
-                if diagnostic_data.stack_version:
-                    attributes["stack_version"] = diagnostic_data.stack_version
-                if diagnostic_data.app_version:
-                    attributes["app_version"] = diagnostic_data.app_version
-                # Add RSSI data
+                for field, attr_key, formatter in _DIAGNOSTIC_ATTRIBUTES:
+                    value = getattr(diagnostic_data, field)
+                    if value:
+                        attributes[attr_key] = formatter(value) if formatter else value
+
+                # RSSI is checked against None since 0 dBm is a valid reading
                 if diagnostic_data.rssi is not None:
                     attributes["rssi"] = f"{diagnostic_data.rssi} dBm"
 
-                # Network configuration
-                if diagnostic_data.channel:
-                    attributes["channel"] = diagnostic_data.channel
-                if diagnostic_data.pan_id:
-                    attributes["pan_id"] = diagnostic_data.pan_id
-
-                # Network status
-                if diagnostic_data.active_tcp_connections:
-                    attributes["tcp_connections_count"] = len(
-                        diagnostic_data.active_tcp_connections
-                    )
-                    # Add details for each TCP connection
-                    for i, conn in enumerate(diagnostic_data.active_tcp_connections):
-                        attributes[f"tcp_connection_{i+1}"] = str(conn)
-
-                if diagnostic_data.udp_ports:
-                    attributes["udp_ports"] = ", ".join(
-                        str(port) for port in diagnostic_data.udp_ports
-                    )
-
-                if diagnostic_data.tcp_ports:
-                    attributes["tcp_ports"] = ", ".join(
-                        str(port) for port in diagnostic_data.tcp_ports
-                    )
-
-                if diagnostic_data.neighbor_devices:
-                    attributes["neighbor_devices_count"] = len(
-                        diagnostic_data.neighbor_devices
-                    )
-                    # Add details for each neighbor device
-                    for i, neighbor in enumerate(diagnostic_data.neighbor_devices):
-                        attributes[f"neighbor_device_{i+1}"] = str(neighbor)
+                # Count and details for each TCP connection and neighbor device
+                for field, count_key, item_prefix in _DIAGNOSTIC_LISTS:
+                    items = getattr(diagnostic_data, field)
+                    if items:
+                        attributes[count_key] = len(items)
+                        attributes |= {
+                            f"{item_prefix}_{i}": str(item)
+                            for i, item in enumerate(items, start=1)
+                        }
 
             # Add timestamp if available
             if self._last_timestamp:
@@ -382,12 +416,7 @@ class BRouteSensorEntity(SensorEntity):
                 attributes["t_phase_current"] = f"{data['t_phase_current']} A"
 
         # Handle attributes for other sensors
-        if self.entity_description.key == "e7_power":
-            timestamp_key = "power_timestamp"
-        elif self.entity_description.key == "ea_forward":
-            timestamp_key = "forward_timestamp"
-        elif self.entity_description.key == "eb_reverse":
-            timestamp_key = "reverse_timestamp"
+        timestamp_key = _TIMESTAMP_KEYS.get(self.entity_description.key)
 
         if data and timestamp_key in data:
             self._last_timestamp = data[timestamp_key]
@@ -397,10 +426,9 @@ class BRouteSensorEntity(SensorEntity):
 
         return attributes
 
-    @property
-    def native_value(self) -> float | str | None:
-        """Current sensor reading."""
-        data = self._coordinator.data
+    def _compute_native_value(self) -> float | str | None:
+        """Compute the sensor reading from the coordinator data."""
+        data = self.coordinator.data
         _LOGGER.debug(
             "Getting value for %s, data: %s", self.entity_description.key, data
         )
@@ -412,49 +440,16 @@ class BRouteSensorEntity(SensorEntity):
         if key == "diagnostic_info":
             diagnostic_data = data.get(key)
             if diagnostic_data:
-                # Intelligently determine connection status - check multiple dimensions
-                is_online = False
-
-                # 1. If has IPv6 address, consider it online
-                if diagnostic_data.ipv6_address:
-                    is_online = True
-
-                # 2. Or if has neighbor devices, connection still exists
-                elif diagnostic_data.neighbor_devices:
-                    is_online = True
-
-                # 3. If has TCP connections, also indicates connection exists
-                elif diagnostic_data.active_tcp_connections:
-                    is_online = True
-
-                # Final status determination
-                connection_status = "ONLINE" if is_online else "OFFLINE"
-
-                # Add signal strength information (if available)
-                if diagnostic_data.rssi is not None:
-                    # Add signal quality indicator
-                    signal_quality = "GOOD"
-                    if diagnostic_data.rssi < -80:
-                        signal_quality = "POOR"
-                    elif diagnostic_data.rssi < -70:
-                        signal_quality = "FAIR"
-
-                    connection_status = f"{connection_status} ({signal_quality} {diagnostic_data.rssi}dBm)"
-
-                # Add connection and neighbor count information
-                connection_info = []
-                if diagnostic_data.active_tcp_connections:
-                    tcp_count = len(diagnostic_data.active_tcp_connections)
-                    connection_info.append(f"{tcp_count} CONN")
-
-                if diagnostic_data.neighbor_devices:
-                    neighbor_count = len(diagnostic_data.neighbor_devices)
-                    connection_info.append(f"{neighbor_count} NEIGH")
-
-                # Combine status components
-                if connection_info:
-                    return f"{connection_status} ({', '.join(connection_info)})"
-                return connection_status
+                tcp_count = len(diagnostic_data.active_tcp_connections or ())
+                neighbor_count = len(diagnostic_data.neighbor_devices or ())
+                # Connection is considered online if it has an IPv6 address,
+                # neighbor devices or TCP connections
+                is_online = bool(
+                    diagnostic_data.ipv6_address or neighbor_count or tcp_count
+                )
+                return _diagnostic_status(
+                    is_online, diagnostic_data.rssi, tcp_count, neighbor_count
+                )
             return "NO DATA"
 
         # Normal handling for other sensors
@@ -474,30 +469,17 @@ class BRouteSensorEntity(SensorEntity):
         self._last_state = value
 
         # Format numeric-type sensors
-        if key in ["e7_power", "e8_current", "e9_voltage", "ea_forward", "eb_reverse"]:
-            # Ensure the value is numeric
+        formatter = _NUMERIC_FORMATTERS.get(key)
+        if formatter is None:
+            return value
+
+        # Ensure the value is a float, the coordinator normally provides one.
+        # Integers are still converted so round() keeps returning a float.
+        if not isinstance(value, float):
             try:
-                numeric_value = float(value)
-                # Use different precision based on sensor type
-                if key == "e7_power":  # Power, integer
-                    return int(numeric_value)
-                elif key in [
-                    "e8_current",
-                    "e9_voltage",
-                ]:  # Current and voltage, 1 decimal place
-                    return round(numeric_value, 1)
-                elif key in ["ea_forward", "eb_reverse"]:  # Energy, 2 decimal places
-                    return round(numeric_value, 2)
+                value = float(value)
             except (ValueError, TypeError):
                 _LOGGER.warning("Invalid numeric value for %s: %s", key, value)
                 return None  # Return None instead of "Invalid data" string
 
-        return value
-
-    async def async_added_to_hass(self) -> None:
-        """Register update listener when entity is added."""
-        self._coordinator.async_add_listener(self.async_write_ha_state)
-
-    async def async_remove_listener(self) -> None:
-        """Remove the listener."""
-        self._coordinator.async_remove_listener(self.async_write_ha_state)
+        return formatter(value)
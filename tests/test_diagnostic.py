@@ -1,18 +1,25 @@
 """Test the diagnostic functionality of the b_route_meter integration."""
 
+import logging
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from custom_components.b_route_meter.adapter_interface import DiagnosticInfo
 from custom_components.b_route_meter.coordinator import (
     DIAGNOSTIC_UPDATE_INTERVAL,
     BRouteDataCoordinator,
 )
-from custom_components.b_route_meter.sensor import SENSOR_TYPES, BRouteSensorEntity
+from custom_components.b_route_meter.sensor import (
+    SENSOR_TYPES,
+    BRouteSensorEntity,
+    _diagnostic_status,
+    async_setup_entry,
+)
 
 
 class MockBP35A1:
@@ -104,6 +111,156 @@ def test_diagnostic_sensor_entity():
     assert entity.entity_description.entity_registry_enabled_default is False
 
 
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (
+            {"e7_power": 500, "operation_status": "ON", "rssi": -65},
+            {
+                "e7_power": True,
+                "operation_status": True,
+                "current_limit": False,
+                "rssi": True,
+                "diagnostic_info": True,
+            },
+        ),
+        (
+            None,
+            {
+                "e7_power": True,
+                "operation_status": False,
+                "current_limit": False,
+                "rssi": False,
+                "diagnostic_info": False,
+            },
+        ),
+    ],
+)
+@pytest.mark.asyncio
+async def test_setup_entry_enables_supported_sensors(
+    hass: HomeAssistant, data, expected
+):
+    """Test that optional sensors are enabled only when the meter supports them."""
+    coordinator = MagicMock()
+    coordinator.async_config_entry_first_refresh = AsyncMock()
+    coordinator.data = data
+    mock_config_entry = MagicMock()
+    mock_config_entry.runtime_data = coordinator
+    async_add_entities = MagicMock()
+
+    await async_setup_entry(hass, mock_config_entry, async_add_entities)
+
+    entities = {
+        entity.entity_description.key: entity
+        for entity in async_add_entities.call_args.args[0]
+    }
+    assert len(entities) == len(SENSOR_TYPES)
+    for key, enabled in expected.items():
+        assert (
+            entities[key].entity_description.entity_registry_enabled_default is enabled
+        ), key
+
+
+@pytest.fixture
+def voltage_sensor(hass: HomeAssistant) -> BRouteSensorEntity:
+    """Create a voltage sensor on a real coordinator with state writes stubbed."""
+    coordinator = DataUpdateCoordinator(
+        hass, logging.getLogger(__name__), name="b_route_test"
+    )
+    coordinator.async_set_updated_data({"e9_voltage": 100.0})
+
+    mock_config_entry = MagicMock()
+    mock_config_entry.runtime_data = coordinator
+    description = next(desc for desc in SENSOR_TYPES if desc.key == "e9_voltage")
+
+    entity = BRouteSensorEntity(mock_config_entry, description)
+    entity.async_write_ha_state = MagicMock()
+
+    # First update always writes the state
+    entity._handle_coordinator_update()
+    assert entity.async_write_ha_state.call_count == 1
+    return entity
+
+
+@pytest.mark.asyncio
+async def test_identical_update_skips_state_write(voltage_sensor):
+    """Test that an update with unchanged data does not write the state."""
+    voltage_sensor.coordinator.async_set_updated_data({"e9_voltage": 100.0})
+    voltage_sensor._handle_coordinator_update()
+
+    assert voltage_sensor.async_write_ha_state.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_value_writes_state(voltage_sensor):
+    """Test that an update with a new value writes the state."""
+    voltage_sensor.coordinator.async_set_updated_data({"e9_voltage": 101.0})
+    voltage_sensor._handle_coordinator_update()
+
+    assert voltage_sensor.async_write_ha_state.call_count == 2
+    assert voltage_sensor.native_value == 101.0
+
+
+@pytest.mark.asyncio
+async def test_failed_update_writes_state(voltage_sensor):
+    """Test that a failed coordinator update writes the unavailable state."""
+    voltage_sensor.coordinator.last_update_success = False
+    voltage_sensor._handle_coordinator_update()
+
+    assert voltage_sensor.async_write_ha_state.call_count == 2
+    assert not voltage_sensor.available
+
+
+@pytest.mark.parametrize(
+    ("rssi", "expected"),
+    [
+        (-81, "ONLINE (POOR -81dBm)"),
+        (-80, "ONLINE (FAIR -80dBm)"),
+        (-71, "ONLINE (FAIR -71dBm)"),
+        (-70, "ONLINE (GOOD -70dBm)"),
+    ],
+)
+def test_diagnostic_status_signal_quality(rssi, expected):
+    """Test the signal quality buckets at the RSSI thresholds."""
+    assert _diagnostic_status(True, rssi, 0, 0) == expected
+
+
+@pytest.mark.parametrize(
+    ("diagnostic_info", "expected"),
+    [
+        (DiagnosticInfo(), "OFFLINE"),
+        (DiagnosticInfo(rssi=-85), "OFFLINE (POOR -85dBm)"),
+        (DiagnosticInfo(ipv6_address="FE80::1"), "ONLINE"),
+        (
+            DiagnosticInfo(neighbor_devices=[{"ipv6_addr": "FE80::1"}]),
+            "ONLINE (1 NEIGH)",
+        ),
+        (
+            DiagnosticInfo(active_tcp_connections=[{"handle": "1"}]),
+            "ONLINE (1 CONN)",
+        ),
+        (
+            DiagnosticInfo(
+                ipv6_address="FE80::1",
+                rssi=-65,
+                active_tcp_connections=[{"handle": "1"}],
+                neighbor_devices=[{"ipv6_addr": "FE80::1"}, {"ipv6_addr": "FE80::2"}],
+            ),
+            "ONLINE (GOOD -65dBm) (1 CONN, 2 NEIGH)",
+        ),
+    ],
+)
+def test_diagnostic_sensor_state(diagnostic_info, expected):
+    """Test the online/offline state reported by the diagnostic sensor."""
+    description = next(desc for desc in SENSOR_TYPES if desc.key == "diagnostic_info")
+    mock_config_entry = MagicMock()
+    mock_config_entry.runtime_data.data = {"diagnostic_info": diagnostic_info}
+
+    entity = BRouteSensorEntity(mock_config_entry, description)
+
+    assert entity.native_value == expected
+
+
 @pytest.mark.asyncio
 async def test_diagnostic_info_update(hass: HomeAssistant, mock_coordinator):
     """Test diagnostic info update timing."""